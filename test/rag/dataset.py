@@ -1,5 +1,6 @@
 import datetime
 import logging
+import sys
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional, Tuple, Literal
 
@@ -119,7 +120,7 @@ class RAGDataset:
                 category="default",
                 query=dpr_sample["question"],
                 gt_answers=dpr_sample["answers"],
-                pos_chunks=dpr_sample["positive_ctxs"]["text"],
+                pos_chunks=[sys.intern(c) for c in dpr_sample["positive_ctxs"]["text"]],
                 neg_chunks=dpr_sample["negative_ctxs"]["text"],
                 hn_chunks=dpr_sample["hard_negative_ctxs"]["text"],
             )
@@ -1,12 +1,13 @@
 import numpy as np
 import wandb
-from collections import defaultdict
 from omegaconf import DictConfig
 import json
 from pathlib import Path
 import logging
+import sys
 from coco import CocoClient
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
+from bisect import bisect_right
 from tqdm import tqdm
 
 from dataset import RAGDataset
@@ -17,16 +18,14 @@ logger = logging.getLogger(__name__)
 def get_top_chunks(
     cc: CocoClient, cfg: DictConfig, ds: RAGDataset
 ) -> Dict[str, Dict[str, Any]]:
+    top_k = cfg.retrieval.get_top_chunks.top_k
     if cfg.retrieval.get_top_chunks.load_from_file:
         # load from file if specified
         chunks_file = Path(cfg.retrieval.get_top_chunks.load_file_name)
         with chunks_file.open("r") as f:
             top_chunks = json.load(f)
         logger.info(f"Loaded retrieved chunks from {chunks_file}")
-        if (
-            not len(top_chunks[next(iter(top_chunks))]["ids"])
-            == cfg.retrieval.get_top_chunks.top_k
-        ):
+        if not len(top_chunks[next(iter(top_chunks))]["ids"]) == top_k:
             logger.warning(f"Retrieved chunks from {chunks_file} do not match top_k")
     else:
         # obtain from db
@@ -34,7 +33,7 @@ def get_top_chunks(
         queries = ds.queries()
         results = cc.rag.retrieve_multiple(
             query_texts=queries,
-            n_results=cfg.retrieval.get_top_chunks.top_k,
+            n_results=top_k,
             model=cfg.retrieval.embedding_model[0],
             show_progress=True,
         )
@@ -47,6 +46,11 @@ def get_top_chunks(
             }
         logger.info(f"Retrieved chunks from database")
 
+    # intern documents so set and list.index lookups of interned gt chunks hit the
+    # identity fast path instead of comparing full chunk texts
+    for chunks in top_chunks.values():
+        chunks["documents"] = [sys.intern(d) for d in chunks["documents"]]
+
     # save to file
     output_file = Path(cfg.retrieval.get_top_chunks.output_file_name)
     output_file.parent.mkdir(parents=True, exist_ok=True)
@@ -57,20 +61,25 @@ def get_top_chunks(
     return top_chunks
 
 
-def precision_at_k(retrieved_chunks: List[str], gt_chunks: List[str], k: int):
-    if k > len(retrieved_chunks):
-        return float("nan")
-    retrieved_chunks_k = retrieved_chunks[:k]
-    n_correct = len(set(gt_chunks) & set(retrieved_chunks_k))
-    return n_correct / k
+def first_positions(retrieved_chunks: List[str], gt_chunks: List[str]) -> List[int]:
+    """Position of the first retrieved copy of each gt chunk, in gt order.
 
+    Gt chunks that were not retrieved are skipped, duplicated gt chunks repeat
+    their position.
+    """
+    # both loop in C, and list.index is only called for chunks that were retrieved
+    found = set(gt_chunks).intersection(retrieved_chunks)
+    return [
+        retrieved_chunks.index(gt_chunk) for gt_chunk in gt_chunks if gt_chunk in found
+    ]
 
-def recall_at_k(retrieved_chunks: List[str], gt_chunks: List[str], k: int):
-    if k > len(retrieved_chunks):
-        return float("nan")
-    retrieved_chunks_k = retrieved_chunks[:k]
-    n_correct = len(set(gt_chunks) & set(retrieved_chunks_k))
-    return n_correct / len(gt_chunks)
+
+def precision_at_k(hit_positions: List[int], k: int):
+    return bisect_right(hit_positions, k - 1) / k
+
+
+def recall_at_k(hit_positions: List[int], n_gt: int, k: int):
+    return bisect_right(hit_positions, k - 1) / n_gt
 
 
 def f1_score(precision: float, recall: float):
@@ -81,13 +90,21 @@ def f1_score(precision: float, recall: float):
     return 2 * (precision * recall) / (precision + recall)
 
 
-def rank_first_relevant(
-    retrieved_chunks: List[str], gt_chunks: List[str], cfg: DictConfig
-):
-    for i, retrieved_chunk in enumerate(retrieved_chunks):
-        if retrieved_chunk in gt_chunks:
-            return i + 1
-    return cfg.retrieval.rank_first_relevant_punishment
+def order_aware_metrics(
+    hit_positions: List[int], gt_positions: List[int], n_gt: int, punishment: int
+) -> Tuple[int, float]:
+    """Rank of the first relevant chunk and average precision from hit positions.
+
+    Like precision at k, the precision at each gt position counts distinct hits,
+    while duplicated gt chunks add one term each.
+    """
+    rank = hit_positions[0] + 1 if hit_positions else punishment
+    if n_gt == 0:
+        return rank, float("nan")
+    ap = 0.0
+    for position in gt_positions:
+        ap += bisect_right(hit_positions, position) / (position + 1)
+    return rank, ap / n_gt
 
 
 def mean_reciprocal_rank(ranks: List[int]):
@@ -96,17 +113,6 @@ def mean_reciprocal_rank(ranks: List[int]):
     return np.mean(inv)
 
 
-def average_precision(retrieved_chunks: List[str], gt_chunks: List[str]):
-    weighted_precision = 0
-    for gt_chunk in gt_chunks:
-        try:
-            idx = retrieved_chunks.index(gt_chunk)
-        except ValueError:  # not present
-            continue
-        weighted_precision += precision_at_k(retrieved_chunks, gt_chunks, idx + 1)
-    return weighted_precision / len(gt_chunks)
-
-
 def mean_average_precision(aps: List[float]):
     return np.nanmean(np.array(aps))
 
@@ -119,65 +125,86 @@ def relevance(top_chunks: Dict[str, Dict[str, Any]], cfg: DictConfig, ds: RAGDat
         cfg (DictConfig): config
         ds (RAGDataset): dataset
     """
+    metric_ks = tuple(cfg.retrieval.metric_ks)
+    punishment = cfg.retrieval.rank_first_relevant_punishment
+    unique_cats = tuple(ds.unique_categories())
+
     category_sample_metrics = {
         cat: {
-            "precs": defaultdict(list),
-            "recs": defaultdict(list),
-            "f1s": defaultdict(list),
+            "precs": [],
+            "recs": [],
+            "f1s": [],
             "ranks": [],
             "aps": [],
         }
-        for cat in ds.unique_categories()
+        for cat in unique_cats
     }
     category_sample_metrics["full"] = {
-        "precs": defaultdict(list),
-        "recs": defaultdict(list),
-        "f1s": defaultdict(list),
+        "precs": [],
+        "recs": [],
+        "f1s": [],
         "ranks": [],
         "aps": [],
     }
 
     # sample wise metrics
-    for sample in tqdm(ds, desc="Computing context relevance metrics"):
+    for sample in tqdm(
+        ds,
+        desc="Computing context relevance metrics",
+        mininterval=1.0,
+        smoothing=0.1,
+    ):
         retrieved_chunks = top_chunks[sample.query]["documents"]
-
-        # order independent metrics
-        for k in cfg.retrieval.metric_ks:
-            prec = precision_at_k(retrieved_chunks, sample.pos_chunks, k)
-            rec = recall_at_k(retrieved_chunks, sample.pos_chunks, k)
-            f1 = f1_score(prec, rec)
-            category_sample_metrics[sample.category]["precs"][k].append(prec)
-            category_sample_metrics[sample.category]["recs"][k].append(rec)
-            category_sample_metrics[sample.category]["f1s"][k].append(f1)
+        # duplicated gt chunks count towards n_gt, as in earlier runs
+        n_gt = len(sample.pos_chunks)
+        sample_metrics = category_sample_metrics[sample.category]
+
+        gt_positions = first_positions(retrieved_chunks, sample.pos_chunks)
+        # one sorted position per distinct retrieved gt chunk
+        hit_positions = sorted(set(gt_positions))
+        n_retrieved = len(retrieved_chunks)
+
+        # order independent metrics, one row entry per k
+        precs, recs, f1s = [], [], []
+        for k in metric_ks:
+            if k > n_retrieved:
+                prec = rec = f1 = float("nan")
+            else:
+                prec = precision_at_k(hit_positions, k)
+                rec = recall_at_k(hit_positions, n_gt, k)
+                f1 = f1_score(prec, rec)
+            precs.append(prec)
+            recs.append(rec)
+            f1s.append(f1)
+        sample_metrics["precs"].append(precs)
+        sample_metrics["recs"].append(recs)
+        sample_metrics["f1s"].append(f1s)
 
         # order aware metrics
-        category_sample_metrics[sample.category]["ranks"].append(
-            rank_first_relevant(retrieved_chunks, sample.pos_chunks, cfg)
-        )
-        category_sample_metrics[sample.category]["aps"].append(
-            average_precision(retrieved_chunks, sample.pos_chunks)
-        )
+        rank, ap = order_aware_metrics(hit_positions, gt_positions, n_gt, punishment)
+        sample_metrics["ranks"].append(rank)
+        sample_metrics["aps"].append(ap)
 
     # aggregate metrics across categories
     for cat, sample_metrics in category_sample_metrics.items():
         if cat == "full":
             continue
-        for k in cfg.retrieval.metric_ks:
-            category_sample_metrics["full"]["precs"][k].extend(
-                sample_metrics["precs"][k]
-            )
-            category_sample_metrics["full"]["recs"][k].extend(sample_metrics["recs"][k])
-            category_sample_metrics["full"]["f1s"][k].extend(sample_metrics["f1s"][k])
+        category_sample_metrics["full"]["precs"].extend(sample_metrics["precs"])
+        category_sample_metrics["full"]["recs"].extend(sample_metrics["recs"])
+        category_sample_metrics["full"]["f1s"].extend(sample_metrics["f1s"])
         category_sample_metrics["full"]["ranks"].extend(sample_metrics["ranks"])
         category_sample_metrics["full"]["aps"].extend(sample_metrics["aps"])
 
+    n_ks = len(metric_ks)
     for cat, sample_metrics in category_sample_metrics.items():
-        # dataset wise order independent metrics
-        macro_avg_prec, macro_avg_rec, macro_avg_f1 = {}, {}, {}
-        for k in cfg.retrieval.metric_ks:
-            macro_avg_prec[k] = np.nanmean(np.array(sample_metrics["precs"][k]))
-            macro_avg_rec[k] = np.nanmean(np.array(sample_metrics["recs"][k]))
-            macro_avg_f1[k] = np.nanmean(np.array(sample_metrics["f1s"][k]))
+        # dataset wise order independent metrics, (n_samples, n_ks) -> (n_ks,)
+        # explicit shape so that no samples still give one NaN per k
+        precs = np.array(sample_metrics["precs"], dtype=float).reshape(-1, n_ks)
+        recs = np.array(sample_metrics["recs"], dtype=float).reshape(-1, n_ks)
+        f1s = np.array(sample_metrics["f1s"], dtype=float).reshape(-1, n_ks)
+        macro_avg_prec = np.nanmean(precs, axis=0)
+        macro_avg_rec = np.nanmean(recs, axis=0)
+        macro_avg_f1 = np.nanmean(f1s, axis=0)
 
         # dataset wise order aware metrics
         m_r = np.nanmean(np.array(sample_metrics["ranks"]))
@@ -189,16 +216,12 @@ def relevance(top_chunks: Dict[str, Dict[str, Any]], cfg: DictConfig, ds: RAGDat
             "mrr": m_rr,
             "map": m_ap,
         }
-        for k in cfg.retrieval.metric_ks:
-            metrics[f"precision@{str(k).zfill(4)}"] = np.nanmean(
-                np.array(sample_metrics["precs"][k])
-            )
-            metrics[f"recall@{str(k).zfill(4)}"] = np.nanmean(
-                np.array(sample_metrics["recs"][k])
-            )
-            metrics[f"f1@{str(k).zfill(4)}"] = np.nanmean(
-                np.array(sample_metrics["f1s"][k])
-            )
+        for k, prec, rec, f1 in zip(
+            metric_ks, macro_avg_prec, macro_avg_rec, macro_avg_f1
+        ):
+            metrics[f"precision@{str(k).zfill(4)}"] = prec
+            metrics[f"recall@{str(k).zfill(4)}"] = rec
+            metrics[f"f1@{str(k).zfill(4)}"] = f1
         wandb.log(
             {f"retrieval/{cat}/context_relevance/{k}": v for k, v in metrics.items()}
         )
@@ -1,103 +1,207 @@
 import streamlit as st
-import json
+import orjson
 from pathlib import Path
 import hydra
-from omegaconf import DictConfig, OmegaConf
-from data import get_hf_dpr_dataset
+from omegaconf import DictConfig
 import sys
-from hydra.core.hydra_config import HydraConfig
 import traceback
-import wandb  # NEW: Import wandb to retrieve run links
-import re
+import functools
+from itertools import islice
+from typing import Iterable, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append("../dataset")
-import parse  # type: ignore
 from dataset import RAGDataset
 
 
+class _PunctTable(dict):
+    r"""str.translate table deleting what [^\w\s] matches, filled per code point."""
+
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        char = chr(codepoint)
+        keep = char.isalnum() or char == "_" or char.isspace()
+        self[codepoint] = codepoint if keep else None
+        return self[codepoint]
+
+
+_PUNCT_TABLE = _PunctTable()
+
+
+# ASCII fast path tables, matching what \s and [^\w\s] cover for ASCII input
+_ASCII_WS = bytes(c for c in range(128) if chr(c).isspace())
+_ASCII_WS_TABLE = bytes.maketrans(_ASCII_WS, b" " * len(_ASCII_WS))
+_ASCII_PUNCT = bytes(
+    c for c in range(128) if not (chr(c).isalnum() or chr(c) == "_" or c in _ASCII_WS)
+)
+
+
+def _normalize_ascii(txt: str) -> str:
+    """Regex-free equivalent of the normalization for ASCII text."""
+    collapsed = b" ".join(txt.encode("ascii").translate(_ASCII_WS_TABLE).split())
+    return collapsed.translate(None, _ASCII_PUNCT).decode("ascii")
+
+
 def normalize_text(txt: str) -> str:
     """Normalize text for robust comparison."""
     txt = txt.strip().lower()
-    txt = re.sub(r"\s+", " ", txt)  # Replace multiple spaces with one
-    txt = re.sub(r"[^\w\s]", "", txt)  # Remove punctuation
-    return txt
+    if txt.isascii():
+        return _normalize_ascii(txt)
+    # Replace multiple spaces with one, then remove punctuation
+    return " ".join(txt.split()).translate(_PUNCT_TABLE)
 
 
-def load_run_data(run_dir: str):
-    """Load retrieved chunks and generated answers for a run."""
-    run_path = Path(run_dir)
+def gt_chunks_found(gt_chunks: List[str], ret_docs: List[str]) -> bool:
+    """Check whether all gt chunks are among the retrieved documents."""
+    if not gt_chunks:
+        return False
+    # Retrieved chunks usually match byte for byte, only normalize otherwise
+    ret_set = set(ret_docs)
+    if all(gt_chunk in ret_set for gt_chunk in gt_chunks):
+        return True
+    norm_ret = {normalize_text(ret_doc) for ret_doc in ret_docs}
+    return all(normalize_text(gt_chunk) in norm_ret for gt_chunk in gt_chunks)
 
-    # Initialize with empty dictionaries
-    retrieved_chunks = {}
-    answers_ret = {}
-    answers_gt = {}
 
-    # Load files if they exist
-    if (run_path / "retrieved_chunks.json").exists():
-        retrieved_chunks = json.load((run_path / "retrieved_chunks.json").open())
-    else:
-        st.warning(f"File not found: {run_path}/retrieved_chunks.json")
+def _load_json_file(path: Path) -> Optional[dict]:
+    """Load a JSON file, or return None if it does not exist."""
+    try:
+        return orjson.loads(path.read_bytes())
+    except FileNotFoundError:
+        return None
 
-    if (run_path / "generated_answers_ret.json").exists():
-        answers_ret = json.load((run_path / "generated_answers_ret.json").open())
-    else:
-        st.warning(f"File not found: {run_path}/generated_answers_ret.json")
 
-    if (run_path / "generated_answers_gt.json").exists():
-        answers_gt = json.load((run_path / "generated_answers_gt.json").open())
-    else:
-        st.warning(f"File not found: {run_path}/generated_answers_gt.json")
+def render_chunks(chunks: Iterable[str]):
+    """Render numbered chunks, each followed by a rule.
+
+    Each chunk body stays its own element so unbalanced markdown inside a chunk
+    cannot spill into the next one. Only the rule and the following header are
+    merged into one element.
+    """
+    rendered = False
+    for i, chunk in enumerate(chunks):
+        st.markdown(f"---\n\n**Chunk {i+1}**" if rendered else f"**Chunk {i+1}**")
+        st.write(chunk)
+        rendered = True
+    if rendered:
+        st.markdown("---")
+
 
-    return retrieved_chunks, answers_ret, answers_gt
+@st.cache_resource(show_spinner="Loading run data...")
+def load_run_data(run_dir: str, _dataset: RAGDataset):
+    """Load retrieved documents and generated answers for a run.
+
+    Results are lists aligned with the dataset samples, so rendering a sample
+    indexes by sample position instead of hashing its query. Cached as a shared
+    resource keyed on run_dir, the viewer only reads the returned data.
+    """
+    run_path = Path(run_dir)
+    paths = [
+        run_path / "retrieved_chunks.json",
+        run_path / "generated_answers_ret.json",
+        run_path / "generated_answers_gt.json",
+    ]
+
+    # The files are independent, so overlap their reads
+    with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+        loaded = list(executor.map(_load_json_file, paths))
+
+    # Warn from the script thread, Streamlit calls from workers are dropped
+    for path, data in zip(paths, loaded):
+        if data is None:
+            st.warning(f"File not found: {path}")
+    retrieved_chunks, answers_ret, answers_gt = (data or {} for data in loaded)
+
+    # Align everything with the samples once instead of on every render
+    queries = _dataset.queries()
+    retrieved_docs = [
+        retrieved_chunks.get(query, {}).get("documents", []) for query in queries
+    ]
+    answers_ret = [answers_ret.get(query) for query in queries]
+    answers_gt = [answers_gt.get(query) for query in queries]
+
+    return retrieved_docs, answers_ret, answers_gt
+
+
+@st.cache_resource(show_spinner="Matching ground truth chunks...")
+def load_gt_found(run_dir: str, _dataset: RAGDataset, _retrieved_docs: List[list]):
+    """Check for every sample whether all its gt chunks were retrieved.
+
+    Only the single run view shows this, so it is kept out of load_run_data.
+    Keyed on run_dir like load_run_data, whose retrieved_docs it is given.
+    """
+    return [
+        gt_chunks_found(sample.pos_chunks, ret_docs)
+        for sample, ret_docs in zip(_dataset, _retrieved_docs)
+    ]
+
+
+@st.cache_resource(show_spinner=False)
+def _wandb_api():
+    """Create the WandB API client once so auth setup is not repeated."""
+    import wandb  # imported lazily, only needed for run links
+
+    return wandb.Api()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _wandb_run_url(entity: str, project: str, run_name: str) -> Optional[str]:
+    """Look up the WandB URL of a run by name, filtered server side."""
+    api_obj = _wandb_api()
+    runs = api_obj.runs(
+        f"{entity}/{project}", filters={"display_name": run_name}, per_page=1
+    )
+    for run in runs:
+        return run.url
+    return None
 
 
 def get_wandb_run_url(cfg: DictConfig, run_name: str):
     """Get the WandB URL for a given run name."""
     if hasattr(cfg, "wandb") and hasattr(cfg.wandb, "entity"):
         try:
-            api_obj = wandb.Api()
-            # Get all runs for the specified entity/project
-            runs = api_obj.runs(f"{cfg.wandb.entity}/{cfg.wandb.project}")
-            matched_run = None
-            for run in runs:
-                if run.name == run_name:
-                    matched_run = run
-                    break
-            if matched_run:
-                return matched_run.url
-            else:
-                return None
+            return _wandb_run_url(cfg.wandb.entity, cfg.wandb.project, run_name)
         except Exception as e:
             return None
     return None
 
 
-def load_dataset(cfg: DictConfig):
-    """Load the dataset without caching."""
-    if cfg.data.type == "hf_dpr":
-        hf_dpr_dataset = get_hf_dpr_dataset(cfg)
+@functools.lru_cache(maxsize=None)
+def _sample_schema(sample_type: type) -> dict[str, str]:
+    """Describe a sample class for the debug panel, computed once per class."""
+    attributes = {*dir(sample_type), *getattr(sample_type, "__annotations__", {})}
+    return {"type": str(sample_type), "dir": str(sorted(attributes))}
+
+
+@st.cache_resource(show_spinner="Loading dataset...")
+def load_dataset(_cfg: DictConfig):
+    """Load the dataset once per viewer process.
+
+    The leading underscore keeps Streamlit from hashing the unhashable config.
+    """
+    # dataset loaders are imported lazily so only the configured one is paid for
+    if _cfg.data.type == "hf_dpr":
+        from data import get_hf_dpr_dataset
+
+        hf_dpr_dataset = get_hf_dpr_dataset(_cfg)
         return RAGDataset.from_dpr_dataset(hf_dpr_dataset)
-    elif cfg.data.type == "custom":
-        custom_datasets = parse.get_datasets(samples_path=cfg.data.custom_samples_root)
+    elif _cfg.data.type == "custom":
+        import parse  # type: ignore
+
+        custom_datasets = parse.get_datasets(samples_path=_cfg.data.custom_samples_root)
         return RAGDataset.from_custom_datasets(custom_datasets)
     else:
-        st.error(f"Invalid dataset type: {cfg.data.type}")
+        st.error(f"Invalid dataset type: {_cfg.data.type}")
         return None
 
 
-def display_single_run(cfg: DictConfig, dataset):
+def display_single_run(cfg: DictConfig):
     """Display details for a single run."""
-    # Store run data in session_state to persist between reruns
+    # Store run name in session_state to persist between mode switches
     if "single_run_name" not in st.session_state:
         st.session_state.single_run_name = ""
-        st.session_state.single_run_data = None
 
     run_name = st.text_input("Enter run name:", value=st.session_state.single_run_name)
-
-    # Check if run name changed
-    if run_name != st.session_state.single_run_name:
-        st.session_state.single_run_name = run_name
-        st.session_state.single_run_data = None  # Reset data when run name changes
+    st.session_state.single_run_name = run_name
 
     if run_name:
         st.markdown("**Model:**")
@@ -117,40 +221,36 @@ def display_single_run(cfg: DictConfig, dataset):
             st.error(f"Run directory not found: {run_dir}")
             return False
 
+        # The dataset is only needed once a run can actually be shown
+        dataset = load_dataset(cfg)
+
         # Debug sample structure
         if len(dataset) > 0:
-            st.session_state.sample_debug = {
-                "type": str(type(dataset[0])),
-                "dir": str(dir(dataset[0])),
-            }
-
-        # Load run data if it hasn't been loaded yet or if run name changed
-        if st.session_state.single_run_data is None:
-            retrieved_chunks, answers_ret, answers_gt = load_run_data(run_dir)
-            st.session_state.single_run_data = {
-                "retrieved_chunks": retrieved_chunks,
-                "answers_ret": answers_ret,
-                "answers_gt": answers_gt,
-            }
+            st.session_state.sample_debug = _sample_schema(type(dataset[0]))
+
+        # Load run data, served from the cache after the first load
+        retrieved_docs, answers_ret, answers_gt = load_run_data(run_dir, dataset)
+        # Precompute the gt containment badge so navigating samples does no matching
+        all_found = load_gt_found(run_dir, dataset, retrieved_docs)
 
         # Store data in session state for the viewer
         st.session_state.data = {
             "ds": dataset,
-            "retrieved_chunks": st.session_state.single_run_data["retrieved_chunks"],
-            "answers_ret": st.session_state.single_run_data["answers_ret"],
-            "answers_gt": st.session_state.single_run_data["answers_gt"],
+            "retrieved_docs": retrieved_docs,
+            "answers_ret": answers_ret,
+            "answers_gt": answers_gt,
+            "all_found": all_found,
             "n_samples": len(dataset),
         }
         return True
     return False
 
 
-def display_run_comparison(cfg: DictConfig, dataset):
+def display_run_comparison(cfg: DictConfig):
     """Display comparison between two different runs."""
-    # Store run data in session_state to persist between reruns
+    # Store run names in session_state to persist between mode switches
     if "comparison_run_names" not in st.session_state:
         st.session_state.comparison_run_names = {"run1": "", "run2": ""}
-        st.session_state.comparison_run_data = {"run1": None, "run2": None}
 
     col1, col2 = st.columns(2)
 
@@ -167,18 +267,8 @@ def display_run_comparison(cfg: DictConfig, dataset):
             value=st.session_state.comparison_run_names["run2"],
         )
 
-    # Check if run names changed
-    if run1_name != st.session_state.comparison_run_names["run1"]:
-        st.session_state.comparison_run_names["run1"] = run1_name
-        st.session_state.comparison_run_data["run1"] = (
-            None  # Reset data when run name changes
-        )
-
-    if run2_name != st.session_state.comparison_run_names["run2"]:
-        st.session_state.comparison_run_names["run2"] = run2_name
-        st.session_state.comparison_run_data["run2"] = (
-            None  # Reset data when run name changes
-        )
+    st.session_state.comparison_run_names["run1"] = run1_name
+    st.session_state.comparison_run_names["run2"] = run2_name
 
     if not run1_name or not run2_name:
         st.info("Please enter both run names to compare.")
@@ -199,41 +289,27 @@ def display_run_comparison(cfg: DictConfig, dataset):
         st.error(f"Run directory not found: {run2_dir}")
         return False
 
-    # Load run data for each run if it hasn't been loaded yet or if run name changed
-    if st.session_state.comparison_run_data["run1"] is None:
-        retrieved_chunks1, answers_ret1, answers_gt1 = load_run_data(run1_dir)
-        st.session_state.comparison_run_data["run1"] = {
-            "retrieved_chunks": retrieved_chunks1,
-            "answers_ret": answers_ret1,
-            "answers_gt": answers_gt1,
-        }
+    # The dataset is only needed once both runs can actually be shown
+    dataset = load_dataset(cfg)
 
-    if st.session_state.comparison_run_data["run2"] is None:
-        retrieved_chunks2, answers_ret2, answers_gt2 = load_run_data(run2_dir)
-        st.session_state.comparison_run_data["run2"] = {
-            "retrieved_chunks": retrieved_chunks2,
-            "answers_ret": answers_ret2,
-            "answers_gt": answers_gt2,
-        }
+    # Load run data for each run, served from the cache after the first load
+    retrieved_docs1, answers_ret1, answers_gt1 = load_run_data(run1_dir, dataset)
+    retrieved_docs2, answers_ret2, answers_gt2 = load_run_data(run2_dir, dataset)
 
     # Store data in session state for the comparison viewer
     st.session_state.comparison_data = {
         "ds": dataset,
         "run1": {
             "name": run1_name,
-            "retrieved_chunks": st.session_state.comparison_run_data["run1"][
-                "retrieved_chunks"
-            ],
-            "answers_ret": st.session_state.comparison_run_data["run1"]["answers_ret"],
-            "answers_gt": st.session_state.comparison_run_data["run1"]["answers_gt"],
+            "retrieved_docs": retrieved_docs1,
+            "answers_ret": answers_ret1,
+            "answers_gt": answers_gt1,
         },
         "run2": {
             "name": run2_name,
-            "retrieved_chunks": st.session_state.comparison_run_data["run2"][
-                "retrieved_chunks"
-            ],
-            "answers_ret": st.session_state.comparison_run_data["run2"]["answers_ret"],
-            "answers_gt": st.session_state.comparison_run_data["run2"]["answers_gt"],
+            "retrieved_docs": retrieved_docs2,
+            "answers_ret": answers_ret2,
+            "answers_gt": answers_gt2,
         },
         "n_samples": len(dataset),
     }
@@ -253,8 +329,105 @@ def display_run_comparison(cfg: DictConfig, dataset):
     return True
 
 
+@st.fragment
+def display_single_run_view():
+    """Display the selected sample of a single run.
+
+    Runs as a fragment so navigating samples only reruns this view.
+    """
+    # Initialize sample index if needed
+    if "sample_idx" not in st.session_state:
+        st.session_state.sample_idx = 0
+
+    # Unified sample index navigation widget with visual indicator at the top
+    sample_idx = st.number_input(
+        "Select Sample:",
+        min_value=0,
+        max_value=st.session_state.data["n_samples"] - 1,
+        step=1,
+        key="sample_idx",
+    )
+    st.markdown(
+        f"**Showing Sample {sample_idx+1} of {st.session_state.data['n_samples']}**"
+    )
+
+    # Get current sample data using the selected sample_idx
+    ds = st.session_state.data["ds"]
+    sample = ds[sample_idx]
+
+    # Access sample properties
+    query = sample.query
+    gt_answer = sample.gt_answers[0] if sample.gt_answers else ""
+
+    ret_docs_full = st.session_state.data["retrieved_docs"][sample_idx]
+    answer_ret = st.session_state.data["answers_ret"][sample_idx]
+    answer_gt = st.session_state.data["answers_gt"][sample_idx]
+
+    # Ground truth chunks from the sample
+    gt_chunks = sample.pos_chunks
+
+    # Display content
+    st.subheader("Query")
+    st.write(query)
+
+    answer_cols = st.columns(3)
+    with answer_cols[0]:
+        st.subheader("Ground Truth Answer")
+        st.write(gt_answer)
+
+    with answer_cols[1]:
+        st.subheader("Generated (Retrieved)")
+        if answer_ret is not None:
+            st.write(answer_ret)
+            if isinstance(answer_ret, dict) and "token_speed" in answer_ret:
+                st.markdown(f"*Token Speed: {answer_ret['token_speed']:.2f} tokens/s*")
+        else:
+            st.info("No retrieved answer available")
+
+    with answer_cols[2]:
+        st.subheader("Generated (GT)")
+        if answer_gt is not None:
+            st.write(answer_gt)
+            if isinstance(answer_gt, dict) and "token_speed" in answer_gt:
+                st.markdown(f"*Token Speed: {answer_gt['token_speed']:.2f} tokens/s*")
+        else:
+            st.info("No ground truth answer available")
+
+    # Debug information, only rendered on request since the sample repr can be large
+    if st.checkbox("Show Debug Information", key="show_debug_info"):
+        if "sample_debug" in st.session_state:
+            st.write("Sample type:", st.session_state.sample_debug["type"])
+            st.write("Sample attributes:", st.session_state.sample_debug["dir"])
+
+        # Current sample inspection
+        st.write("Current sample:", sample)
+
+    st.markdown("---")
+    chunk_cols = st.columns(2)
+    with chunk_cols[0]:
+        # Whether all GT chunks are present in the full list of retrieved documents
+        all_found = st.session_state.data["all_found"][sample_idx]
+        header_text = "Retrieved Chunks"
+        if gt_chunks:
+            header_text += " ✅" if all_found else " ❌"
+        st.subheader(header_text)
+        if ret_docs_full:
+            # Display only the top 5 retrieved chunks for brevity
+            render_chunks(islice(ret_docs_full, 5))
+        else:
+            st.info("No retrieved chunks available")
+
+    with chunk_cols[1]:
+        st.subheader("Ground Truth Chunks")
+        render_chunks(gt_chunks)
+
+
+@st.fragment
 def display_comparison_view():
-    """Display comparison view for two runs."""
+    """Display comparison view for two runs.
+
+    Runs as a fragment so navigating samples only reruns this view.
+    """
     # Access the comparison data from session state
     data = st.session_state.comparison_data
     ds = data["ds"]
@@ -289,8 +462,8 @@ def display_comparison_view():
 
     with col1:
         st.markdown(f"**Run 1: {data['run1']['name']}**")
-        if query in data["run1"]["answers_ret"]:
-            answer1 = data["run1"]["answers_ret"][query]
+        answer1 = data["run1"]["answers_ret"][sample_idx]
+        if answer1 is not None:
             if isinstance(answer1, dict) and "answer" in answer1:
                 st.write(answer1["answer"])
                 if "token_speed" in answer1:
@@ -302,8 +475,8 @@ def display_comparison_view():
 
     with col2:
         st.markdown(f"**Run 2: {data['run2']['name']}**")
-        if query in data["run2"]["answers_ret"]:
-            answer2 = data["run2"]["answers_ret"][query]
+        answer2 = data["run2"]["answers_ret"][sample_idx]
+        if answer2 is not None:
             if isinstance(answer2, dict) and "answer" in answer2:
                 st.write(answer2["answer"])
                 if "token_speed" in answer2:
@@ -320,33 +493,24 @@ def display_comparison_view():
 
     with col1:
         st.markdown(f"**Run 1: {data['run1']['name']}**")
-        ret_docs1 = data["run1"]["retrieved_chunks"].get(query, {}).get("documents", [])
+        ret_docs1 = data["run1"]["retrieved_docs"][sample_idx]
         if ret_docs1:
-            for i, chunk in enumerate(ret_docs1[:5]):  # Show top 5
-                st.markdown(f"**Chunk {i+1}**")
-                st.write(chunk)
-                st.markdown("---")
+            render_chunks(islice(ret_docs1, 5))  # Show top 5
         else:
             st.info("No retrieved chunks available")
 
     with col2:
         st.markdown(f"**Run 2: {data['run2']['name']}**")
-        ret_docs2 = data["run2"]["retrieved_chunks"].get(query, {}).get("documents", [])
+        ret_docs2 = data["run2"]["retrieved_docs"][sample_idx]
         if ret_docs2:
-            for i, chunk in enumerate(ret_docs2[:5]):  # Show top 5
-                st.markdown(f"**Chunk {i+1}**")
-                st.write(chunk)
-                st.markdown("---")
+            render_chunks(islice(ret_docs2, 5))  # Show top 5
         else:
             st.info("No retrieved chunks available")
 
     # Compare with ground truth chunks
     st.markdown("## Ground Truth Chunks")
     gt_chunks = sample.pos_chunks
-    for i, chunk in enumerate(gt_chunks):
-        st.markdown(f"**Chunk {i+1}**")
-        st.write(chunk)
-        st.markdown("---")
+    render_chunks(gt_chunks)
 
 
 def app(cfg: DictConfig):
@@ -355,9 +519,6 @@ def app(cfg: DictConfig):
     st.set_page_config(layout="wide")
     st.title("RAG Results Viewer")
 
-    # Load dataset once at application startup
-    dataset = load_dataset(cfg)
-
     # Create two columns - left for config, right for main content
     config_col, main_col = st.columns([1, 4])
 
@@ -372,124 +533,15 @@ def app(cfg: DictConfig):
         # Initialize data based on selected mode
         if view_mode == "Single Run":
             st.subheader("Experiment Config")
-            has_data = display_single_run(cfg, dataset)
+            has_data = display_single_run(cfg)
         else:
             st.subheader("Run Comparison")
-            has_data = display_run_comparison(cfg, dataset)
+            has_data = display_run_comparison(cfg)
 
     with main_col:
         if view_mode == "Single Run" and "data" in st.session_state:
-            # Initialize sample index if needed
-            if "sample_idx" not in st.session_state:
-                st.session_state.sample_idx = 0
-
-            # Unified sample index navigation widget with visual indicator at the top
-            sample_idx = st.number_input(
-                "Select Sample:",
-                min_value=0,
-                max_value=st.session_state.data["n_samples"] - 1,
-                step=1,
-                key="sample_idx",
-            )
-            st.markdown(
-                f"**Showing Sample {sample_idx+1} of {st.session_state.data['n_samples']}**"
-            )
-
-            # Get current sample data using the selected sample_idx
-            ds = st.session_state.data["ds"]
-            sample = ds[sample_idx]
-
-            # Access sample properties
-            query = sample.query
-            gt_answer = sample.gt_answers[0] if sample.gt_answers else ""
-
-            retrieved_chunks = st.session_state.data["retrieved_chunks"]
-            answers_ret = st.session_state.data["answers_ret"]
-            answers_gt = st.session_state.data["answers_gt"]
-
-            # Ground truth chunks from the sample
-            gt_chunks = sample.pos_chunks
-
-            # Display content
-            st.subheader("Query")
-            st.write(query)
-
-            answer_cols = st.columns(3)
-            with answer_cols[0]:
-                st.subheader("Ground Truth Answer")
-                st.write(gt_answer)
-
-            with answer_cols[1]:
-                st.subheader("Generated (Retrieved)")
-                if query in answers_ret:
-                    st.write(answers_ret[query])
-                    if (
-                        isinstance(answers_ret[query], dict)
-                        and "token_speed" in answers_ret[query]
-                    ):
-                        st.markdown(
-                            f"*Token Speed: {answers_ret[query]['token_speed']:.2f} tokens/s*"
-                        )
-                else:
-                    st.info("No retrieved answer available")
-
-            with answer_cols[2]:
-                st.subheader("Generated (GT)")
-                if query in answers_gt:
-                    st.write(answers_gt[query])
-                    if (
-                        isinstance(answers_gt[query], dict)
-                        and "token_speed" in answers_gt[query]
-                    ):
-                        st.markdown(
-                            f"*Token Speed: {answers_gt[query]['token_speed']:.2f} tokens/s*"
-                        )
-                else:
-                    st.info("No ground truth answer available")
-
-            # Debug information
-            with st.expander("Debug Information"):
-                if "sample_debug" in st.session_state:
-                    st.write("Sample type:", st.session_state.sample_debug["type"])
-                    st.write("Sample attributes:", st.session_state.sample_debug["dir"])
-
-                # Current sample inspection
-                st.write("Current sample:", sample)
-
-            st.markdown("---")
-            chunk_cols = st.columns(2)
-            with chunk_cols[0]:
-                # Check if all GT chunks are present in the full list of retrieved documents
-                ret_docs_full = retrieved_chunks.get(query, {}).get("documents", [])
-                if gt_chunks:
-                    all_found = all(
-                        any(
-                            normalize_text(ret_doc) == normalize_text(gt_chunk)
-                            for ret_doc in ret_docs_full
-                        )
-                        for gt_chunk in gt_chunks
-                    )
-                else:
-                    all_found = False
-                header_text = "Retrieved Chunks"
-                if gt_chunks:
-                    header_text += " ✅" if all_found else " ❌"
-                st.subheader(header_text)
-                if ret_docs_full:
-                    # Display only the top 5 retrieved chunks for brevity
-                    for i, chunk in enumerate(ret_docs_full[:5]):
-                        st.markdown(f"**Chunk {i+1}**")
-                        st.write(chunk)
-                        st.markdown("---")
-                else:
-                    st.info("No retrieved chunks available")
-
-            with chunk_cols[1]:
-                st.subheader("Ground Truth Chunks")
-                for i, chunk in enumerate(gt_chunks):
-                    st.markdown(f"**Chunk {i+1}**")
-                    st.write(chunk)
-                    st.markdown("---")
+            # Display single run view
+            display_single_run_view()
 
         elif view_mode == "Compare Runs" and "comparison_data" in st.session_state:
             # Display comparison view
@@ -498,13 +550,7 @@ def app(cfg: DictConfig):
 
 @hydra.main(config_path="conf", config_name="config", version_base="1.3")
 def main(cfg: DictConfig) -> None:
-    # Initialize Hydra manually to avoid reinitialization issues
-    try:
-        hydra.initialize(config_path="conf", job_name="rag_viewer", version_base="1.3")
-    except ValueError:
-        # Already initialized, ignore
-        pass
-
+    # hydra.main has already set up Hydra and composed cfg, no manual init needed
     try:
         app(cfg)
     except Exception as e: